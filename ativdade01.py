@@ -1,9 +1,41 @@
+import sys
+
+import numba
 import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
 from pathlib import Path
 
 
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def _ajustar_e_avaliar(x, y):
+    """Ajusta a reta e calcula SS_res/SS_tot em duas passadas paralelas"""
+    n = x.size
+
+    soma_x = 0.0
+    soma_y = 0.0
+    for i in numba.prange(n):
+        soma_x += x[i]
+        soma_y += y[i]
+    media_x = soma_x / n
+    media_y = soma_y / n
+
+    soma_xx = 0.0
+    soma_xy = 0.0
+    ss_tot = 0.0
+    for i in numba.prange(n):
+        desvio_x = x[i] - media_x
+        desvio_y = y[i] - media_y
+        soma_xx += desvio_x * desvio_x
+        soma_xy += desvio_x * desvio_y
+        ss_tot += desvio_y * desvio_y
+
+    coef_angular = soma_xy / soma_xx
+    intercepto = media_y - coef_angular * media_x
+    # Identidade dos mínimos quadrados: SS_res = SS_tot − β₁·Sxy
+    ss_res = ss_tot - coef_angular * soma_xy
+
+    return intercepto, coef_angular, ss_res, ss_tot
+
+
 class ModeloRegressaoLinear:
     """Classe para análise de regressão linear simples"""
     
@@ -14,17 +46,32 @@ class ModeloRegressaoLinear:
         self.intercepto = None
         self.r_quadrado = None
         self.predicoes = None
+        self._soma_quad_residuos = None
+        self._soma_quad_total = None
+        self._n_observacoes = None
     
     def carregar_dados(self, caminho_x='X.txt', caminho_y='y.txt'):
         """Carrega os dados dos arquivos de texto"""
+        # Import tardio: pandas só é necessário neste ponto do pipeline
+        import pandas as pd
+
         try:
-            self.dados_x = np.loadtxt(caminho_x)
-            self.dados_y = np.loadtxt(caminho_y)
+            # pd.read_csv usa um tokenizador em C, muito mais rápido que o
+            # parsing linha a linha em Python do np.loadtxt. float32 é mais
+            # que suficiente para estes dados e usa metade da banda de memória
+            self.dados_x = pd.read_csv(
+                caminho_x, header=None, dtype=np.float32, engine='c'
+            ).to_numpy().squeeze()
+            self.dados_y = pd.read_csv(
+                caminho_y, header=None, dtype=np.float32, engine='c'
+            ).to_numpy().squeeze()
             
-            print("📂 Dados carregados com sucesso!")
-            print(f"   Total de observações: {len(self.dados_x)}")
-            print(f"   Variável X: [{self.dados_x.min():.2f}, {self.dados_x.max():.2f}]")
-            print(f"   Variável Y: [{self.dados_y.min():.2f}, {self.dados_y.max():.2f}]")
+            sys.stdout.write(
+                "📂 Dados carregados com sucesso!\n"
+                f"   Total de observações: {len(self.dados_x)}\n"
+                f"   Variável X: [{self.dados_x.min():.2f}, {self.dados_x.max():.2f}]\n"
+                f"   Variável Y: [{self.dados_y.min():.2f}, {self.dados_y.max():.2f}]\n"
+            )
             
             return True
             
@@ -42,40 +89,102 @@ class ModeloRegressaoLinear:
             return False
         
         print("\n🔧 Treinando modelo de regressão linear...")
+
+        # Método dos mínimos quadrados em forma fechada:
+        # β₁ = cov(x, y) / var(x) e β₀ = ȳ − β₁·x̄
+        # Ajuste e somas de quadrados em loops jitados (acumuladores float64)
+        (self.intercepto, self.coef_angular,
+         self._soma_quad_residuos, self._soma_quad_total) = _ajustar_e_avaliar(
+            self.dados_x, self.dados_y
+        )
         
-        # Construir matriz de design
-        n_observacoes = len(self.dados_x)
-        matriz_design = np.column_stack([np.ones(n_observacoes), self.dados_x])
-        
-        # Método dos mínimos quadrados: β = (X'X)^(-1) X'y
-        xtx = matriz_design.T @ matriz_design
-        xty = matriz_design.T @ self.dados_y
-        coeficientes = np.linalg.solve(xtx, xty)
-        
-        self.intercepto = coeficientes[0]
-        self.coef_angular = coeficientes[1]
-        
+        self._n_observacoes = len(self.dados_y)
+
         # Calcular predições
         self.predicoes = self.intercepto + self.coef_angular * self.dados_x
-        
+
         print("✅ Modelo treinado com sucesso!\n")
-        
+
         return True
-    
+
+    def treinar_streaming(self, caminho_x='X.txt', caminho_y='y.txt',
+                          tamanho_bloco=1_000_000):
+        """Treina o modelo lendo os arquivos em blocos, com memória O(bloco)
+
+        Mantém apenas os momentos acumulados (n, Σx, Σy, Σx², Σxy, Σy²) e
+        deriva os coeficientes e somas de quadrados em forma fechada, sem
+        nunca materializar os arrays completos.
+        """
+        import pandas as pd
+
+        print("\n🔧 Treinando modelo em modo streaming...")
+
+        n = 0
+        soma_x = soma_y = soma_xx = soma_xy = soma_yy = 0.0
+
+        try:
+            blocos_x = pd.read_csv(caminho_x, header=None, dtype=np.float64,
+                                   engine='c', chunksize=tamanho_bloco)
+            blocos_y = pd.read_csv(caminho_y, header=None, dtype=np.float64,
+                                   engine='c', chunksize=tamanho_bloco)
+
+            # Avançar os dois iteradores explicitamente (zip pararia no mais
+            # curto e engoliria blocos excedentes de um dos arquivos)
+            while True:
+                bloco_x = next(blocos_x, None)
+                bloco_y = next(blocos_y, None)
+                if bloco_x is None and bloco_y is None:
+                    break
+                if bloco_x is None or bloco_y is None:
+                    print("❌ Erro: X e y têm números de observações diferentes!")
+                    return False
+
+                x = bloco_x.to_numpy().ravel()
+                y = bloco_y.to_numpy().ravel()
+                if x.size != y.size:
+                    print("❌ Erro: X e y têm números de observações diferentes!")
+                    return False
+                n += x.size
+                soma_x += x.sum()
+                soma_y += y.sum()
+                soma_xx += np.dot(x, x)
+                soma_xy += np.dot(x, y)
+                soma_yy += np.dot(y, y)
+
+        except FileNotFoundError:
+            print("❌ Erro: Um ou mais arquivos não foram encontrados!")
+            return False
+        except Exception as erro:
+            print(f"❌ Erro ao carregar dados: {erro}")
+            return False
+
+        # Identidades dos momentos: β₁ = (n·Σxy − Σx·Σy) / (n·Σx² − (Σx)²)
+        self.coef_angular = (n * soma_xy - soma_x * soma_y) / (n * soma_xx - soma_x ** 2)
+        self.intercepto = (soma_y - self.coef_angular * soma_x) / n
+        self._soma_quad_total = soma_yy - soma_y ** 2 / n
+        self._soma_quad_residuos = (
+            self._soma_quad_total
+            - self.coef_angular * (soma_xy - soma_x * soma_y / n)
+        )
+        self._n_observacoes = n
+
+        print(f"✅ Modelo treinado com sucesso! ({n} observações)\n")
+
+        return True
+
     def calcular_metricas(self):
         """Calcula métricas de qualidade do modelo"""
-        if self.predicoes is None:
+        if self._soma_quad_residuos is None:
             print("❌ Treine o modelo primeiro!")
             return
-        
-        # R² (Coeficiente de determinação)
-        residuos = self.dados_y - self.predicoes
-        soma_quad_residuos = np.sum(residuos ** 2)
-        soma_quad_total = np.sum((self.dados_y - np.mean(self.dados_y)) ** 2)
+
+        # R² (Coeficiente de determinação) — somas já calculadas no treino
+        soma_quad_residuos = self._soma_quad_residuos
+        soma_quad_total = self._soma_quad_total
         self.r_quadrado = 1 - (soma_quad_residuos / soma_quad_total)
-        
+
         # MSE (Erro Quadrático Médio)
-        mse = soma_quad_residuos / len(self.dados_y)
+        mse = soma_quad_residuos / self._n_observacoes
         rmse = np.sqrt(mse)
         
         print("📊 MÉTRICAS DO MODELO:")
@@ -93,16 +202,40 @@ class ModeloRegressaoLinear:
         if self.predicoes is None:
             print("❌ Treine o modelo primeiro!")
             return None
-        
+
+        # Import tardio: plotly é pesado (~400ms) e só é usado aqui
+        import plotly.graph_objects as go
+        import plotly.io as pio
+
+        # orjson serializa arrays numpy direto do buffer, bem mais rápido
+        # que o encoder JSON próprio do plotly
+        try:
+            pio.json.config.default_engine = 'orjson'
+        except ValueError:
+            pass  # orjson não instalado; mantém o encoder padrão
+
         print("📈 Gerando visualização...")
         
         # Criar figura
         grafico = go.Figure()
-        
+
         # Adicionar pontos observados
-        grafico.add_trace(go.Scatter(
-            x=self.dados_x,
-            y=self.dados_y,
+        # Acima do limite, amostrar pontos para não inflar o HTML nem travar
+        # o navegador; a linha de regressão continua exata
+        limite_pontos = 20000
+        if self.dados_x.size > limite_pontos:
+            indices = np.random.default_rng(0).choice(
+                self.dados_x.size, limite_pontos, replace=False
+            )
+            x_pontos = self.dados_x[indices]
+            y_pontos = self.dados_y[indices]
+        else:
+            x_pontos = self.dados_x
+            y_pontos = self.dados_y
+
+        grafico.add_trace(go.Scattergl(
+            x=x_pontos,
+            y=y_pontos,
             mode='markers',
             name='Dados Reais',
             marker=dict(
@@ -115,14 +248,13 @@ class ModeloRegressaoLinear:
         ))
         
         # Adicionar linha de regressão
-        # Ordenar para melhor visualização
-        indices_ordenados = np.argsort(self.dados_x)
-        x_ordenado = self.dados_x[indices_ordenados]
-        y_pred_ordenado = self.predicoes[indices_ordenados]
-        
+        # Uma reta só precisa de dois pontos: os extremos de x
+        x_linha = np.array([self.dados_x.min(), self.dados_x.max()])
+        y_linha = self.intercepto + self.coef_angular * x_linha
+
         grafico.add_trace(go.Scatter(
-            x=x_ordenado,
-            y=y_pred_ordenado,
+            x=x_linha,
+            y=y_linha,
             mode='lines',
             name=f'Modelo (R²={self.r_quadrado:.4f})',
             line=dict(color='#e74c3c', width=3),
@@ -164,8 +296,16 @@ class ModeloRegressaoLinear:
             margin=dict(l=80, r=50, t=120, b=80)
         )
         
-        # Salvar arquivo
-        grafico.write_html(salvar_como, include_plotlyjs='cdn')
+        # Salvar arquivo (validate=False evita a validação de schema do
+        # Plotly sobre cada atributo dos traces, um gargalo conhecido)
+        grafico.write_html(
+            salvar_como,
+            include_plotlyjs='cdn',
+            full_html=True,
+            config={'displaylogo': False, 'responsive': True},
+            auto_open=False,
+            validate=False
+        )
         
         print(f"✅ Visualização salva em: {salvar_como}\n")
         
@@ -188,9 +328,12 @@ class ModeloRegressaoLinear:
 
 def main():
     """Função principal"""
-    print("\n" + "╔" + "═" * 68 + "╗")
-    print("║" + " " * 15 + "SISTEMA DE ANÁLISE DE REGRESSÃO LINEAR" + " " * 15 + "║")
-    print("╚" + "═" * 68 + "╝\n")
+    # Banner estático em uma única escrita (um syscall em vez de três)
+    sys.stdout.write(
+        "\n╔" + "═" * 68 + "╗\n"
+        "║" + " " * 15 + "SISTEMA DE ANÁLISE DE REGRESSÃO LINEAR" + " " * 15 + "║\n"
+        "╚" + "═" * 68 + "╝\n\n"
+    )
     
     # Criar instância do modelo
     modelo = ModeloRegressaoLinear()
@@ -203,9 +346,11 @@ def main():
     )
     
     if sucesso:
-        print("╔" + "═" * 68 + "╗")
-        print("║" + " " * 20 + "✓ ANÁLISE CONCLUÍDA COM SUCESSO!" + " " * 17 + "║")
-        print("╚" + "═" * 68 + "╝\n")
+        sys.stdout.write(
+            "╔" + "═" * 68 + "╗\n"
+            "║" + " " * 20 + "✓ ANÁLISE CONCLUÍDA COM SUCESSO!" + " " * 17 + "║\n"
+            "╚" + "═" * 68 + "╝\n\n"
+        )
     else:
         print("\n❌ A análise não pôde ser concluída.\n")
     
@@ -1,9 +1,28 @@
+import sys
+
 import requests
-import pandas as pd
-import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime
+from pathlib import Path
 import calendar
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _ffill_vetorizado(valores):
+    """Forward-fill em numpy puro: propaga o índice do último valor válido
+
+    Duas passadas sobre um array de inteiros que vetorizam bem, sem o
+    teste de NaN por elemento do ffill do pandas.
+    """
+    validos = ~np.isnan(valores)
+    indices = np.where(validos, np.arange(valores.size), 0)
+    np.maximum.accumulate(indices, out=indices)
+    return valores[indices]
+
 
 class ConsultadorDolarPTAX:
     """Classe para consultar e visualizar cotações do dólar"""
@@ -12,51 +31,94 @@ class ConsultadorDolarPTAX:
         self.periodo = periodo
         self.url_api = "https://olinda.bcb.gov.br/olinda/servico/PTAX/versao/v1/odata/"
         self.dados_processados = None
-        
-    def _converter_periodo(self):
-        """Converte string MMYYYY para objeto datetime"""
+        # Sessão com keep-alive: reusa a conexão TCP/TLS entre consultas
+        self._session = requests.Session()
+        # Converter o período uma única vez em vez de a cada consulta
         try:
-            return datetime.strptime(self.periodo, "%m%Y")
+            self._dt_ref = datetime.strptime(periodo, "%m%Y")
         except ValueError:
             raise ValueError("Período deve estar no formato MMYYYY")
     
     def _montar_url_consulta(self, dt_objeto):
-        """Monta URL de consulta da API"""
+        """Monta URL base e parâmetros de consulta da API"""
         primeiro_dia = 1
         ultimo_dia = calendar.monthrange(dt_objeto.year, dt_objeto.month)[1]
-        
+
         dt_inicio = f"{dt_objeto.month:02d}-{primeiro_dia:02d}-{dt_objeto.year}"
         dt_fim = f"{dt_objeto.month:02d}-{ultimo_dia:02d}-{dt_objeto.year}"
-        
+
         endpoint = (
             f"{self.url_api}CotacaoDolarPeriodo(dataInicial=@dataInicial,"
-            f"dataFinalCotacao=@dataFinalCotacao)?"
-            f"@dataInicial='{dt_inicio}'&@dataFinalCotacao='{dt_fim}'&$format=json"
+            f"dataFinalCotacao=@dataFinalCotacao)"
         )
-        
-        return endpoint, primeiro_dia, ultimo_dia
+        # Deixar o requests montar e codificar a query string
+        parametros = {
+            "@dataInicial": f"'{dt_inicio}'",
+            "@dataFinalCotacao": f"'{dt_fim}'",
+            "$format": "json",
+        }
+
+        return endpoint, parametros, primeiro_dia, ultimo_dia
     
     def buscar_cotacoes(self):
         """Realiza a busca das cotações na API do BCB"""
+        # Import tardio: pandas só é necessário depois da validação/requisição
+        import pandas as pd
+
         print(f"🔍 Buscando cotações para {self.periodo}...")
-        
-        dt_referencia = self._converter_periodo()
-        url_requisicao, dia_ini, dia_fim = self._montar_url_consulta(dt_referencia)
-        
+
+        dt_referencia = self._dt_ref
+
+        # Cotações de meses encerrados são imutáveis: usar cache local em
+        # parquet e evitar repetir o download a cada execução
+        agora = datetime.now()
+        mes_encerrado = (dt_referencia.year, dt_referencia.month) < (agora.year, agora.month)
+        arquivo_cache = Path.home() / '.cache' / 'ptax' / f"{self.periodo}.parquet"
+
+        if mes_encerrado and arquivo_cache.exists():
+            try:
+                self.dados_processados = pd.read_parquet(arquivo_cache)
+                print("📦 Cotações carregadas do cache local")
+                return self.dados_processados
+            except Exception:
+                # Cache corrompido ou ilegível: descartar e buscar na API
+                print("⚠️  Cache local ilegível; consultando a API novamente")
+                try:
+                    arquivo_cache.unlink()
+                except OSError:
+                    pass
+
+        url_requisicao, parametros, dia_ini, dia_fim = self._montar_url_consulta(dt_referencia)
+
         try:
-            resposta = requests.get(url_requisicao, timeout=10)
+            resposta = self._session.get(url_requisicao, params=parametros, timeout=10)
             resposta.raise_for_status()
-            dados_json = resposta.json()
+            if orjson is not None:
+                dados_json = orjson.loads(resposta.content)
+            else:
+                dados_json = resposta.json()
             
             if not dados_json.get('value'):
                 print(f"⚠️  Nenhuma cotação encontrada para {self.periodo}")
                 return None
             
-            # Processar dados da API
-            dataframe = pd.DataFrame(dados_json['value'])
-            dataframe['dataHoraCotacao'] = pd.to_datetime(dataframe['dataHoraCotacao'])
-            dataframe['dia'] = dataframe['dataHoraCotacao'].dt.date
-            dataframe = dataframe[['dia', 'cotacaoVenda']].sort_values('dia')
+            # Processar dados da API coluna a coluna, com dtypes explícitos,
+            # em vez de deixar o pandas inferir a partir da lista de dicts
+            registros = dados_json['value']
+            cotacao_venda = np.fromiter(
+                (r['cotacaoVenda'] for r in registros),
+                dtype=np.float64, count=len(registros)
+            )
+            # Truncar para o dia como datetime64[D] (cast em C, sem criar
+            # objetos datetime.date por linha)
+            dias = pd.to_datetime(
+                [r['dataHoraCotacao'] for r in registros],
+                format='%Y-%m-%d %H:%M:%S.%f', cache=True, errors='raise'
+            ).values.astype('datetime64[D]')
+            dataframe = pd.DataFrame({'dia': dias, 'cotacaoVenda': cotacao_venda})
+            # A API do BCB já retorna em ordem cronológica; só ordenar se preciso
+            if not dataframe['dia'].is_monotonic_increasing:
+                dataframe = dataframe.sort_values('dia')
             
             print(f"✅ {len(dataframe)} registros obtidos")
             
@@ -65,6 +127,15 @@ class ConsultadorDolarPTAX:
                 dataframe, dt_referencia, dia_ini, dia_fim
             )
             
+            if mes_encerrado:
+                # O cache é só uma otimização: nenhuma falha aqui (disco,
+                # permissão, pyarrow ausente...) pode descartar os dados
+                try:
+                    arquivo_cache.parent.mkdir(parents=True, exist_ok=True)
+                    dataframe_completo.to_parquet(arquivo_cache)
+                except Exception as erro:
+                    print(f"⚠️  Não foi possível gravar o cache local: {erro}")
+
             self.dados_processados = dataframe_completo
             return dataframe_completo
             
@@ -77,22 +148,33 @@ class ConsultadorDolarPTAX:
     
     def _preencher_dias_faltantes(self, df_original, dt_ref, dia_inicial, dia_final):
         """Preenche dias sem cotação com o último valor disponível"""
+        import pandas as pd
+
         data_inicio = datetime(dt_ref.year, dt_ref.month, dia_inicial).date()
         data_fim = datetime(dt_ref.year, dt_ref.month, dia_final).date()
-        
-        # Criar range com todos os dias
-        todos_dias = pd.date_range(start=data_inicio, end=data_fim, freq='D').date
-        df_todos_dias = pd.DataFrame({'dia': todos_dias})
-        
-        # Fazer merge e preencher valores faltantes
-        df_final = df_todos_dias.merge(df_original, on='dia', how='left')
-        df_final['cotacaoVenda'].fillna(method='ffill', inplace=True)
-        df_final.rename(columns={'cotacaoVenda': 'valor_cotacao'}, inplace=True)
-        
-        dias_preenchidos = df_final['valor_cotacao'].notna().sum() - len(df_original)
+
+        # Range contíguo de dias como datetime64[D] (um inteiro por dia)
+        todos_dias = np.arange(
+            np.datetime64(data_inicio),
+            np.datetime64(data_fim) + np.timedelta64(1, 'D'),
+            dtype='datetime64[D]'
+        )
+
+        # Mapear as datas da API (já datetime64) para as posições do range
+        dias_api = df_original['dia'].to_numpy().astype('datetime64[D]')
+        posicoes = np.searchsorted(todos_dias, dias_api)
+
+        valores = np.full(todos_dias.size, np.nan)
+        valores[posicoes] = df_original['cotacaoVenda'].to_numpy()
+
+        valores = _ffill_vetorizado(valores)
+
+        df_final = pd.DataFrame({'dia': todos_dias, 'valor_cotacao': valores})
+
+        dias_preenchidos = int((~np.isnan(valores)).sum()) - len(df_original)
         if dias_preenchidos > 0:
             print(f"📝 {dias_preenchidos} dias foram preenchidos com valores anteriores")
-        
+
         return df_final
     
     def gerar_grafico(self):
@@ -100,9 +182,20 @@ class ConsultadorDolarPTAX:
         if self.dados_processados is None:
             print("❌ Não há dados para gerar o gráfico")
             return None
-        
+
+        # Import tardio: plotly é pesado e só é usado aqui
+        import plotly.graph_objects as go
+        import plotly.io as pio
+
+        # Serializar via orjson quando disponível (mais rápido que o
+        # encoder JSON próprio do plotly)
+        try:
+            pio.json.config.default_engine = 'orjson'
+        except ValueError:
+            pass  # orjson não instalado; mantém o encoder padrão
+
         df = self.dados_processados
-        dt_ref = self._converter_periodo()
+        dt_ref = self._dt_ref
         nome_mes = dt_ref.strftime("%B").upper()
         
         # Criar gráfico com plotly graph_objects
@@ -141,9 +234,16 @@ class ConsultadorDolarPTAX:
             margin=dict(l=80, r=50, t=100, b=80)
         )
         
-        # Salvar gráfico
+        # Salvar gráfico (validate=False pula a validação de schema do Plotly)
         nome_arquivo = f"grafico_dolar_ptax_{self.periodo}.html"
-        figura.write_html(nome_arquivo, include_plotlyjs='cdn')
+        figura.write_html(
+            nome_arquivo,
+            include_plotlyjs='cdn',
+            full_html=True,
+            config={'displaylogo': False, 'responsive': True},
+            auto_open=False,
+            validate=False
+        )
         
         print(f"\n✅ Gráfico salvo: {nome_arquivo}")
         print(f"💡 Abra o arquivo para visualização interativa")
@@ -158,9 +258,12 @@ def executar_consulta(mes_ano: str):
             print("\n❌ Formato incorreto! Utilize MMYYYY (exemplo: 072016)")
             return
         
-        print("\n" + "="*75)
-        print("SISTEMA DE CONSULTA - COTAÇÃO DÓLAR PTAX (BCB)")
-        print("="*75 + "\n")
+        # Banner estático em uma única escrita
+        sys.stdout.write(
+            "\n" + "=" * 75 + "\n"
+            "SISTEMA DE CONSULTA - COTAÇÃO DÓLAR PTAX (BCB)\n"
+            + "=" * 75 + "\n\n"
+        )
         
         consultor = ConsultadorDolarPTAX(mes_ano)
         
@@ -172,10 +275,12 @@ def executar_consulta(mes_ano: str):
             consultor.gerar_grafico()
             
             # Exibir estatísticas
-            print("\n📊 ESTATÍSTICAS DO PERÍODO:")
-            print(f"   • Valor mínimo: R$ {dados['valor_cotacao'].min():.4f}")
-            print(f"   • Valor máximo: R$ {dados['valor_cotacao'].max():.4f}")
-            print(f"   • Valor médio: R$ {dados['valor_cotacao'].mean():.4f}")
+            sys.stdout.write(
+                "\n📊 ESTATÍSTICAS DO PERÍODO:\n"
+                f"   • Valor mínimo: R$ {dados['valor_cotacao'].min():.4f}\n"
+                f"   • Valor máximo: R$ {dados['valor_cotacao'].max():.4f}\n"
+                f"   • Valor médio: R$ {dados['valor_cotacao'].mean():.4f}\n"
+            )
         
         print("\n" + "="*75)
         